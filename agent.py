@@ -4,61 +4,201 @@ from dotenv import load_dotenv
 import os
 import asyncio
 import csv
-from pydantic import BaseModel
-from typing import List
+import time
+
+from agent_cache import CACHE_PATH, AgentCache, CachedLLM
+from batch_runner import BrowserSessionPool, ResultWriter, run_with_retries
+from research_tasks import (
+    STAFF_FIELDS,
+    ResearchTask,
+    build_prompt,
+    extract_task,
+    load_tasks,
+    make_rows_model,
+)
+from staff_extract import StaffRows
 
 
 load_dotenv()
 
+# ---------- CONFIG ----------
+MODEL = "gpt-4.1"
 
-class StaffRow(BaseModel):
-    name: str
-    position: str
-    email: str
+# Leave CHROME_PATH unset to use the Playwright-installed Chromium, or point
+# it at a local Chrome, e.g. C:\Program Files\Google\Chrome\Application\chrome.exe
+CHROME_PATH = os.getenv("CHROME_PATH")
 
-class StaffRows(BaseModel):
-    rows: List[StaffRow]
+# Expand user directory for user_data_dir
+USER_DATA_DIR = os.path.expanduser('~/.config/browseruse/profiles/default')
 
-controller = Controller(output_model=StaffRows)
+# Single-task mode (TASKS_FILE = None)
+TASK_URL = "https://southwestmiamieagles.net/staff-directory/"
+OUTPUT_CSV = "staff_directory.csv"
 
-# Expand user directory for user_data_dir
-user_data_dir = os.path.expanduser('~/.config/browseruse/profiles/default')
+# Batch mode: a .csv or .jsonl file of tasks, one per row/line, with
+#   url     (required) page to extract from
+#   fields  (optional) extraction schema, e.g. "name|position|email" in CSV
+#           or ["name", "position", "email"] in JSONL; defaults to STAFF_FIELDS
+#   id, record_type, instructions (optional)
+# Results are streamed per task to RESULTS_FILE (.csv = one line per
+# extracted row, .ndjson = one JSON record per task).
+TASKS_FILE = None
+RESULTS_FILE = "batch_results.ndjson"
 
-browser_session = BrowserSession(
-    executable_path='C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',
-    user_data_dir=user_data_dir,
-)
+MAX_SESSIONS = 4     # browser sessions (and agents) running at once
+MAX_RETRIES = 2      # extra attempts per task after the first failure
+RETRY_DELAY_S = 5.0  # grows linearly with each attempt
+TASK_TIMEOUT_S = 300
+MAX_STEPS = 25
 
-llm = ChatOpenAI(model="gpt-4.1")
+# Try rule-based extraction from the raw HTML (staff_extract.py) before
+# starting a browser + LLM agent; only applies to tasks with the default
+# name/position/email fields (see research_tasks.py for the tiers).
+# The agent still runs when the page yields too few directory rows
+# (MIN_ROWS) or leaves too many of its emails unmatched (MIN_COVERAGE).
+FAST_PATH = True
+MAX_FETCHES = 16  # concurrent fast path page fetches in batch mode
 
-async def main():
+# Reuse final rows and LLM responses for pages whose content hasn't changed
+# (agent_cache.py). The page is still fetched once to fingerprint it.
+USE_CACHE = True
+
+
+def make_browser_session(user_data_dir, **kwargs):
+    if CHROME_PATH:
+        kwargs["executable_path"] = CHROME_PATH
+    return BrowserSession(user_data_dir=user_data_dir, **kwargs)
+
+
+def make_pool_session(slot):
+    # Chrome can't share a profile dir between processes
+    return make_browser_session(f"{USER_DATA_DIR}-pool-{slot}", keep_alive=True)
+
+
+async def stop_session(browser_session):
+    try:
+        await browser_session.stop()
+    except Exception as e:
+        print(f"⚠️  Failed to stop browser session: {e}")
+
+
+async def run_agent_task(task, llm, browser_session, cache=None, fingerprint=None):
+    """
+    Run one extraction task through a browser_use Agent and return the
+    validated rows model.
+    """
+    rows_model = make_rows_model(task.fields)
+    if cache is not None:
+        llm = CachedLLM(llm, cache, fingerprint)
     agent = Agent(
-        task=(
-            "Visit https://southwestmiamieagles.net/staff-directory/ and extract staff records. "
-            "Return JSON only in this exact shape: "
-            "{'rows':[{'name':'...','position':'...','email':'...'}]}. "
-            "Include only rows where all three values are present."
-        ),
+        task=build_prompt(task),
         llm=llm,
         browser_session=browser_session,
-        controller=controller,
+        controller=Controller(output_model=rows_model),
     )
-    result = await agent.run()
+    result = await agent.run(max_steps=MAX_STEPS)
     data = result.final_result()
-    parsed: StaffRows = StaffRows.model_validate_json(data)
+    if not data:
+        raise RuntimeError("agent finished without a final result")
+    return rows_model.model_validate_json(data)
+
 
-    output_csv = "staff_directory.csv"
-    with open(output_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "position", "email"])
+async def run_batch(tasks_file, results_file):
+    tasks = load_tasks(tasks_file)
+    if not tasks:
+        print(f"No tasks in {tasks_file}")
+        return
+
+    all_fields = list(dict.fromkeys(field for task in tasks for field in task.fields))
+    pool = BrowserSessionPool(min(MAX_SESSIONS, len(tasks)), make_pool_session, stop_session)
+    fetch_slots = asyncio.Semaphore(MAX_FETCHES)
+    llm = ChatOpenAI(model=MODEL)
+    cache = AgentCache(CACHE_PATH) if USE_CACHE else None
+
+    print(f"📋 {len(tasks)} tasks from {tasks_file}, {len(pool.sessions)} browser sessions")
+    started = time.monotonic()
+    done = 0
+    succeeded = 0
+    retried = 0
+    methods = {"cache": 0, "rules": 0, "agent": 0}
+
+    async def run_task(task, browser_session, fingerprint):
+        return await run_agent_task(task, llm, browser_session, cache, fingerprint)
+
+    with ResultWriter(results_file, all_fields) as writer:
+
+        async def worker(task):
+            nonlocal done, succeeded, retried
+            record = await run_with_retries(
+                task, pool, run_task, fetch_slots, cache,
+                fast_path=FAST_PATH,
+                max_retries=MAX_RETRIES,
+                retry_delay_s=RETRY_DELAY_S,
+                timeout_s=TASK_TIMEOUT_S,
+            )
+            writer.write(record)
+            done += 1
+            succeeded += record["status"] == "ok"
+            retried += record["attempts"] > 1
+            methods[record["method"]] += 1
+            icon = "✅" if record["status"] == "ok" else "❌"
+            detail = f"{len(record['rows'])} rows" if record["status"] == "ok" else record["error"]
+            print(
+                f"[{done}/{len(tasks)}] {icon} {task.id} {task.url} - {detail} "
+                f"(via {record['method']}, attempts={record['attempts']}, {record['elapsed_s']}s)"
+            )
+
+        try:
+            await asyncio.gather(*(worker(task) for task in tasks))
+        finally:
+            await pool.close()
+            if cache is not None:
+                cache.close()
+
+    elapsed_min = (time.monotonic() - started) / 60
+    print(f"\nSaved results: {results_file}")
+    print(f"Succeeded: {succeeded}  Failed: {done - succeeded}  Retried: {retried}")
+    print(f"Cache: {methods['cache']}  Fast path: {methods['rules']}  Agent: {methods['agent']}")
+    if cache is not None:
+        print(f"Cache lookups: {cache.stats_line()}")
+    print(f"Elapsed: {elapsed_min:.1f} min  Throughput: {done / elapsed_min if elapsed_min else 0:.1f} tasks/min")
+
+
+async def main():
+    if TASKS_FILE:
+        await run_batch(TASKS_FILE, RESULTS_FILE)
+        return
+
+    task = ResearchTask(id="1", url=TASK_URL)
+    cache = AgentCache(CACHE_PATH) if USE_CACHE else None
+
+    async def run_agent(fingerprint):
+        browser_session = make_browser_session(USER_DATA_DIR)
+        llm = ChatOpenAI(model=MODEL)
+        try:
+            return await run_agent_task(task, llm, browser_session, cache, fingerprint)
+        finally:
+            await stop_session(browser_session)
+
+    try:
+        parsed: StaffRows
+        parsed, method = await extract_task(task, run_agent, cache, FAST_PATH)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=STAFF_FIELDS)
         writer.writeheader()
         for row in parsed.rows:
             writer.writerow(row.model_dump())
 
-    print(f"Saved CSV: {output_csv}")
-    print(f"Rows exported: {len(parsed.rows)}")
-    await browser_session.stop()
+    print(f"Saved CSV: {OUTPUT_CSV}")
+    print(f"Rows exported: {len(parsed.rows)} (via {method})")
+    if cache is not None:
+        print(f"Cache lookups: {cache.stats_line()}")
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
 
 # Query: Can you webscrape this url and export the staff directory: only the names, positions, and titles. Export in csv format.  The url is : https://southwestmiamieagles.net/staff-directory/
-
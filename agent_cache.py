@@ -0,0 +1,264 @@
+"""
+Agent Cache
+Local, content-addressed cache for agent.py runs, so an unchanged page is
+answered from disk instead of repeating every browser step and LLM call.
+
+Two kinds of entries share one SQLite file:
+- "result": final extracted rows, keyed on the task (URL, fields, record
+            type, instructions) + page fingerprint
+- "llm":    LLM responses, keyed on model + prompt + page fingerprint
+
+Entries expire after a per-kind TTL (or a shorter one given at put time),
+and the least recently used ones are evicted once the cache grows past
+CACHE_MAX_BYTES / CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+# ---------- CONFIG ----------
+CACHE_PATH = "agent_cache.db"
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+CACHE_MAX_ENTRIES = 50_000
+
+TTL_S = {
+    "result": 7 * 24 * 3600,
+    "llm": 7 * 24 * 3600,
+}
+
+# Agent results that can't be checked against the fetched HTML (JS-rendered
+# pages, whose static shell fingerprints the same whatever the directory
+# shows) are only trusted this long
+UNVERIFIED_RESULT_TTL_S = 3600
+
+# Prompt parts that change on every call without changing the question:
+# clock, step counter and browser tab/target ids. Screenshots are dropped
+# by stable_messages, since they differ by a pixel or a cursor blink.
+VOLATILE_PROMPT_PATTERNS = [
+    (re.compile(r"(?:Current date(?: and time)?|Today's date)(?: is)?:?[^\n\"\\]*"), ""),
+    (re.compile(r"\bStep \d+ of \d+(?: max possible steps)?"), "Step"),
+    (re.compile(r"\b(Tab(?: ID)?:?) [0-9A-Fa-f]{4}\b"), r"\1"),
+    (re.compile(r"\b(tab_id|target_id|targetId)(\W{1,3})[0-9A-Za-z-]+"), r"\1\2"),
+]
+
+IMAGE_PART_TYPES = {"image_url", "image"}
+
+
+def digest(*parts):
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def result_key(url, fields, fingerprint, record_type="", instructions=""):
+    return digest(
+        "result", url.strip(), ",".join(fields), record_type.strip(), instructions.strip(), fingerprint
+    )
+
+
+def stable_text(text):
+    for pattern, replacement in VOLATILE_PROMPT_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def stable_messages(data):
+    """
+    Dumped chat messages with image parts removed and volatile text blanked,
+    so two calls about the same page state produce the same cache key.
+    """
+    if isinstance(data, dict):
+        return {key: stable_messages(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [
+            stable_messages(item)
+            for item in data
+            if not (isinstance(item, dict) and item.get("type") in IMAGE_PART_TYPES)
+        ]
+    if isinstance(data, str):
+        return stable_text(data)
+    return data
+
+
+def llm_key(model, prompt, fingerprint):
+    return digest("llm", model, stable_text(prompt), fingerprint)
+
+
+class AgentCache:
+    """
+    SQLite-backed LRU/TTL cache of string values, with hit/miss counts per kind.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES, max_entries=CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = {kind: 0 for kind in TTL_S}
+        self.misses = {kind: 0 for kind in TTL_S}
+        self.conn = sqlite3.connect(self.path)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cache_entries)")}
+        if columns and "expires_at" not in columns:
+            # Older cache layout without per-entry expiry: just start over
+            self.conn.execute("DROP TABLE cache_entries")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache_entries (last_used)")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, kind, key):
+        row = self.conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now > row[1]:
+            if row is not None:
+                self.conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self.conn.commit()
+            self.misses[kind] += 1
+            return None
+
+        self.conn.execute("UPDATE cache_entries SET last_used = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits[kind] += 1
+        return row[0]
+
+    def put(self, kind, key, value, ttl_s=None):
+        now = time.time()
+        expires_at = now + (TTL_S[kind] if ttl_s is None else ttl_s)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, kind, value, size, created_at, expires_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, kind, value, len(value.encode("utf-8")), now, expires_at, now),
+        )
+        self.evict()
+        self.conn.commit()
+
+    def evict(self):
+        """
+        Drop expired entries, then least recently used ones until the cache
+        fits within max_entries and max_bytes.
+        """
+        self.conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+
+        count, total = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        drop = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM cache_entries ORDER BY last_used"
+        ):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            drop.append((key,))
+            count -= 1
+            total -= size
+        self.conn.executemany("DELETE FROM cache_entries WHERE key = ?", drop)
+
+    def stats_line(self):
+        parts = []
+        for kind in TTL_S:
+            lookups = self.hits[kind] + self.misses[kind]
+            rate = f"{self.hits[kind] / lookups:.0%}" if lookups else "n/a"
+            parts.append(f"{kind} {self.hits[kind]}/{lookups} hits ({rate})")
+        return ", ".join(parts)
+
+
+class CachedLLM:
+    """
+    Wraps a browser_use chat model so identical calls for the same page are
+    answered from the cache. The attributes Agent reads (model, provider,
+    name, model_name) are forwarded explicitly, anything else via __getattr__.
+    Cache hits are returned as completion_cls(completion=..., usage=None),
+    browser_use's ChatInvokeCompletion unless another class is given.
+    """
+
+    def __init__(self, llm, cache, fingerprint, completion_cls=None):
+        self._llm = llm
+        self._cache = cache
+        self._fingerprint = fingerprint
+        self._completion_cls = completion_cls
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+    @property
+    def model(self):
+        return self._llm.model
+
+    @property
+    def provider(self):
+        return self._llm.provider
+
+    @property
+    def name(self):
+        return self._llm.name
+
+    @property
+    def model_name(self):
+        return self._llm.model_name
+
+    @property
+    def _verified_api_keys(self):
+        return getattr(self._llm, "_verified_api_keys", False)
+
+    @_verified_api_keys.setter
+    def _verified_api_keys(self, value):
+        self._llm._verified_api_keys = value
+
+    def completion_cls(self):
+        if self._completion_cls is None:
+            from browser_use.llm.views import ChatInvokeCompletion
+
+            self._completion_cls = ChatInvokeCompletion
+        return self._completion_cls
+
+    async def ainvoke(self, messages, output_format=None, **kwargs):
+        prompt = json.dumps(
+            stable_messages([message.model_dump(mode="json") for message in messages]),
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        schema = output_format.__name__ if output_format is not None else ""
+        key = llm_key(self.model, f"{schema}\n{prompt}", self._fingerprint)
+
+        cached = self._cache.get("llm", key)
+        if cached is not None:
+            completion = (
+                output_format.model_validate_json(cached)
+                if output_format is not None else cached
+            )
+            return self.completion_cls()(completion=completion, usage=None)
+
+        response = await self._llm.ainvoke(messages, output_format, **kwargs)
+        completion = response.completion
+        self._cache.put(
+            "llm",
+            key,
+            completion.model_dump_json() if output_format is not None else completion,
+        )
+        return response
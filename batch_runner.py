@@ -0,0 +1,146 @@
+"""
+Batch Runner
+Browser session pool, per-task retries and result streaming for agent.py's
+batch mode. Kept free of browser_use: the pool is given a session factory
+and run_with_retries the agent step, so both can be driven by stub sessions.
+"""
+
+import asyncio
+import csv
+import json
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from research_tasks import RESULT_META_COLUMNS, extract_task
+
+
+class BrowserSessionPool:
+    """
+    A fixed number of browser sessions shared by concurrent tasks.
+    make_session(slot) creates the session for a slot (e.g. with its own
+    profile dir, since Chrome can't share one between processes), and
+    stop_session(session) is awaited to shut one down. A session that fails
+    is stopped and replaced on next use.
+    """
+
+    def __init__(self, size, make_session, stop_session):
+        self.make_session = make_session
+        self.stop_session = stop_session
+        self.sessions = [None] * size
+        self.idle = asyncio.Queue()
+        for slot in range(size):
+            self.idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def session(self):
+        slot = await self.idle.get()
+        try:
+            if self.sessions[slot] is None:
+                self.sessions[slot] = self.make_session(slot)
+            try:
+                yield self.sessions[slot]
+            except BaseException:
+                # Don't hand a possibly broken browser to the next task
+                await self.stop_session(self.sessions[slot])
+                self.sessions[slot] = None
+                raise
+        finally:
+            self.idle.put_nowait(slot)
+
+    async def close(self):
+        for slot, browser_session in enumerate(self.sessions):
+            if browser_session is not None:
+                await self.stop_session(browser_session)
+                self.sessions[slot] = None
+
+
+class ResultWriter:
+    """
+    Streams task results to disk as they finish, so a crash mid-batch keeps
+    everything completed so far.
+    .csv: one line per extracted row (failed tasks get one line with the error)
+    .ndjson: one JSON record per task
+    """
+
+    META_COLUMNS = RESULT_META_COLUMNS
+
+    def __init__(self, path, fields):
+        self.path = Path(path)
+        self.is_csv = self.path.suffix.lower() == ".csv"
+        self.file = open(self.path, "w", newline="", encoding="utf-8")
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=self.META_COLUMNS + list(fields))
+            self.writer.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+    def write(self, record):
+        if self.is_csv:
+            meta = {column: record.get(column) for column in self.META_COLUMNS}
+            for row in record["rows"] or [{}]:
+                self.writer.writerow({**meta, **row})
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+
+def task_record(task, started, status, method, attempts, error=None, parsed=None):
+    return {
+        "task_id": task.id,
+        "url": task.url,
+        "status": status,
+        "method": method,
+        "attempts": attempts,
+        "error": error,
+        "elapsed_s": round(time.monotonic() - started, 2),
+        "rows": [row.model_dump() for row in parsed.rows] if parsed else [],
+    }
+
+
+async def run_with_retries(
+    task,
+    pool,
+    run_agent_task,
+    fetch_slots=None,
+    cache=None,
+    *,
+    fast_path,
+    max_retries,
+    retry_delay_s,
+    timeout_s,
+):
+    """
+    Answer one task via extract_task, running the agent step as
+    run_agent_task(task, browser_session, fingerprint) on a pooled session,
+    with up to max_retries extra attempts. Returns the task's result record.
+    """
+    started = time.monotonic()
+    attempts = 0
+    error = None
+
+    async def run_agent(fingerprint):
+        nonlocal attempts, error
+        for attempt in range(1, max_retries + 2):
+            attempts = attempt
+            try:
+                async with pool.session() as browser_session:
+                    return await asyncio.wait_for(
+                        run_agent_task(task, browser_session, fingerprint),
+                        timeout=timeout_s,
+                    )
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt <= max_retries:
+                    print(f"   ↻ Task {task.id} attempt {attempt} failed ({error}), retrying...")
+                    await asyncio.sleep(retry_delay_s * attempt)
+        return None
+
+    parsed, method = await extract_task(task, run_agent, cache, fast_path, fetch_slots)
+    if parsed is None:
+        return task_record(task, started, "failed", method, attempts, error=error)
+    return task_record(task, started, "ok", method, max(attempts, 1), parsed=parsed)
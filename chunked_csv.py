@@ -0,0 +1,100 @@
+"""
+Chunked CSV Reader
+Reads a CSV in bounded-memory chunks while typing every column exactly the
+way a single pd.read_csv(path) would, so chunked output written back with
+to_csv matches the in-memory output.
+
+Plain chunked reading re-infers dtypes per chunk: an id column is int64 in a
+chunk without blanks but float64 (written "123.0") in the full file, and a
+True/False column with blanks is bool in one chunk and object in another.
+So the file is read twice: pass 1 records what each chunk inferred, pass 2
+reads again and casts every chunk to the merged (whole-file) dtype.
+
+Ids past the int64 range read as uint64 and must stay that way: casting
+them to int64 silently wraps 18446744073709551615 to -1. A whole-file read
+keeps uint64 only when there are no blanks or negative numbers in the
+column; otherwise it falls back to strings, so the merge does the same.
+
+Known limit: columns that pandas itself reports with a DtypeWarning (mixed
+types across its own internal blocks) can still differ.
+"""
+
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_float_dtype,
+    is_signed_integer_dtype,
+    is_unsigned_integer_dtype,
+)
+
+CHUNK_SIZE = 100_000
+
+
+def _chunk_kind(series):
+    values = series.dropna()
+    if values.empty:
+        return None
+    if is_bool_dtype(series.dtype):
+        return "bool"
+    if is_unsigned_integer_dtype(series.dtype):
+        return "uint"
+    if is_signed_integer_dtype(series.dtype):
+        return "int"
+    if is_float_dtype(series.dtype):
+        return "float"
+    if series.dtype == object and all(isinstance(value, bool) for value in values):
+        return "bool"
+    return "str"
+
+
+def infer_dtypes(path, usecols=None, chunksize=CHUNK_SIZE):
+    """
+    Pass 1: returns (str_columns, casts). str_columns must be read as str;
+    casts maps the remaining columns to the dtype each chunk is cast to.
+    """
+    kinds = {}
+    has_nan = {}
+    has_negative = {}
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize):
+        for column in chunk.columns:
+            kind = _chunk_kind(chunk[column])
+            kinds.setdefault(column, set())
+            if kind:
+                kinds[column].add(kind)
+            has_nan[column] = has_nan.get(column, False) or bool(chunk[column].isna().any())
+            negative = kind == "int" and bool((chunk[column] < 0).any())
+            has_negative[column] = has_negative.get(column, False) or negative
+
+    str_columns = []
+    casts = {}
+    for column, column_kinds in kinds.items():
+        if not column_kinds:
+            continue  # all blank: every chunk already reads as float64 NaN
+        if column_kinds == {"bool"}:
+            casts[column] = object if has_nan[column] else bool
+        elif column_kinds <= {"int", "float"}:
+            casts[column] = "int64" if column_kinds == {"int"} and not has_nan[column] else "float64"
+        elif column_kinds <= {"int", "uint"}:
+            if has_nan[column] or has_negative[column]:
+                str_columns.append(column)
+            else:
+                casts[column] = "uint64"
+        elif column_kinds <= {"int", "uint", "float"}:
+            casts[column] = "float64"
+        else:
+            str_columns.append(column)
+    return str_columns, casts
+
+
+def read_csv_chunks(path, usecols=None, chunksize=CHUNK_SIZE):
+    """
+    Pass 2: yields chunks typed the way a single pd.read_csv(path) types them.
+    """
+    str_columns, casts = infer_dtypes(path, usecols=usecols, chunksize=chunksize)
+    for chunk in pd.read_csv(
+        path,
+        usecols=usecols,
+        dtype={column: str for column in str_columns},
+        chunksize=chunksize,
+    ):
+        yield chunk.astype(casts) if casts else chunk
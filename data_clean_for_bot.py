@@ -1,4 +1,6 @@
 import pandas as pd
+
+from chunked_csv import read_csv_chunks
 # PART 1: CLEAN DATA FOR BOT USAGE
 # ---------- CONFIG ----------
 INPUT_CSV = "part1_data_cleanup.csv"
@@ -10,7 +12,21 @@ KEEP_COLUMNS = [
     "application_url"
 ]
 
-def main():
+# Streaming mode: read only KEEP_COLUMNS in chunks of CHUNK_SIZE rows and
+# append each cleaned chunk to OUTPUT_CSV, so memory stays bounded no matter
+# how big the source export is. The input is read twice so every chunk gets
+# the dtypes of a whole-file read and the output matches the in-memory mode
+# (see chunked_csv.py).
+# Set STREAMING = False to load the whole file at once (old behavior).
+STREAMING = True
+CHUNK_SIZE = 100_000
+
+def clean_rows(df):
+    # Optional: drop rows with no application_url
+    df = df.dropna(subset=["application_url"])
+    return df[df["application_url"].str.strip() != ""]
+
+def main_in_memory():
     df = pd.read_csv(INPUT_CSV)
 
     # Validate required columns
@@ -19,16 +35,34 @@ def main():
         raise ValueError(f"Missing required columns: {missing}")
 
     # Keep only the needed columns
-    cleaned_df = df[KEEP_COLUMNS].copy()
-
-    # Optional: drop rows with no application_url
-    cleaned_df = cleaned_df.dropna(subset=["application_url"])
-    cleaned_df = cleaned_df[cleaned_df["application_url"].str.strip() != ""]
+    cleaned_df = clean_rows(df[KEEP_COLUMNS])
 
     cleaned_df.to_csv(OUTPUT_CSV, index=False)
+    return len(cleaned_df)
+
+def main_streaming():
+    # Validate required columns from the header only
+    header = pd.read_csv(INPUT_CSV, nrows=0).columns
+    missing = [c for c in KEEP_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    # Header first, so an input with no data rows still produces a valid file
+    pd.DataFrame(columns=KEEP_COLUMNS).to_csv(OUTPUT_CSV, index=False)
+
+    row_count = 0
+    for chunk in read_csv_chunks(INPUT_CSV, usecols=KEEP_COLUMNS, chunksize=CHUNK_SIZE):
+        cleaned_chunk = clean_rows(chunk[KEEP_COLUMNS])
+        cleaned_chunk.to_csv(OUTPUT_CSV, mode="a", header=False, index=False)
+        row_count += len(cleaned_chunk)
+
+    return row_count
+
+def main():
+    row_count = main_streaming() if STREAMING else main_in_memory()
 
     print(f"Saved cleaned file to: {OUTPUT_CSV}")
-    print(f"Row count: {len(cleaned_df)}")
+    print(f"Row count: {row_count}")
 
 if __name__ == "__main__":
     main()
@@ -1,34 +1,119 @@
+from pathlib import Path
+
 import pandas as pd
 
+from chunked_csv import read_csv_chunks
+
+from expired_store import STORE_PATH, ExpiredJobStore
+
 # File paths
 EXPIRED_FILE = "expired_jobs_bot2.csv" # running doc of non-active jobs
 SOURCE_FILE = "source_jobs_bot2.csv" # full raw data set
 OUTPUT_FILE = "source_jobs_bot_active_only2.csv" # filtered active jobs
 
-# Load CSVs
-expired_df = pd.read_csv(EXPIRED_FILE)
-source_df = pd.read_csv(SOURCE_FILE)
+URL_COLUMN = "application_url"
+
+# Streaming mode: only the URL column of the expired file is loaded, and the
+# source file is filtered in chunks of CHUNK_SIZE rows that are appended to
+# OUTPUT_FILE, so memory stays bounded no matter how big the source is.
+# Files are read twice so every chunk gets the dtypes of a whole-file read
+# and the output matches the in-memory mode (see chunked_csv.py).
+# Set STREAMING = False to load both files at once (old behavior).
+STREAMING = True
+CHUNK_SIZE = 100_000
+
+# Indexed mode: look source URLs up in the expired job store (see
+# expired_store.py) by canonical job ID instead of reading EXPIRED_FILE, so
+# URL variants of an expired job are caught and run time doesn't grow with
+# the expired history. EXPIRED_FILE is (re-)imported into the store whenever
+# it changes. Takes precedence over STREAMING.
+USE_EXPIRED_STORE = True
+
+def require_url_column(columns, filename):
+    if URL_COLUMN not in columns:
+        raise ValueError(f"{filename} is missing '{URL_COLUMN}' column")
+
+def filter_in_memory():
+    # Load CSVs
+    expired_df = pd.read_csv(EXPIRED_FILE)
+    source_df = pd.read_csv(SOURCE_FILE)
+
+    # Ensure application_url exists
+    require_url_column(expired_df.columns, EXPIRED_FILE)
+    require_url_column(source_df.columns, SOURCE_FILE)
+
+    # Convert URLs to sets for fast lookup
+    expired_urls = set(expired_df[URL_COLUMN].dropna().unique())
+
+    # Filter source jobs (keep only non-expired)
+    filtered_source_df = source_df[
+        ~source_df[URL_COLUMN].isin(expired_urls)
+    ]
+
+    # Save output
+    filtered_source_df.to_csv(OUTPUT_FILE, index=False)
+    return len(source_df), len(filtered_source_df)
+
+def filter_streaming():
+    # Ensure application_url exists (headers only)
+    require_url_column(pd.read_csv(EXPIRED_FILE, nrows=0).columns, EXPIRED_FILE)
+    source_columns = pd.read_csv(SOURCE_FILE, nrows=0).columns
+    require_url_column(source_columns, SOURCE_FILE)
+
+    # Only the URL column of the expired file is needed for the lookup set
+    expired_urls = set()
+    for chunk in read_csv_chunks(EXPIRED_FILE, usecols=[URL_COLUMN], chunksize=CHUNK_SIZE):
+        expired_urls.update(chunk[URL_COLUMN].dropna())
+
+    # Header first, so a source with no data rows still produces a valid file
+    pd.DataFrame(columns=source_columns).to_csv(OUTPUT_FILE, index=False)
+
+    source_rows = 0
+    kept_rows = 0
+    for chunk in read_csv_chunks(SOURCE_FILE, chunksize=CHUNK_SIZE):
+        kept = chunk[~chunk[URL_COLUMN].isin(expired_urls)]
+        kept.to_csv(OUTPUT_FILE, mode="a", header=False, index=False)
+        source_rows += len(chunk)
+        kept_rows += len(kept)
+
+    return source_rows, kept_rows
+
+def filter_with_store():
+    source_columns = pd.read_csv(SOURCE_FILE, nrows=0).columns
+    require_url_column(source_columns, SOURCE_FILE)
+
+    pd.DataFrame(columns=source_columns).to_csv(OUTPUT_FILE, index=False)
 
-# Ensure application_url exists
-if "application_url" not in expired_df.columns:
-    raise ValueError("expired_jobs_bot.csv is missing 'application_url' column")
+    source_rows = 0
+    kept_rows = 0
+    with ExpiredJobStore(STORE_PATH) as store:
+        # Pick up the running doc whenever it has changed since the last run
+        if Path(EXPIRED_FILE).exists():
+            added = store.sync_csv(EXPIRED_FILE)
+            if added is not None:
+                print(f"📥 Imported {added} new expired jobs from {EXPIRED_FILE} into {STORE_PATH}")
 
-if "application_url" not in source_df.columns:
-    raise ValueError("source_jobs_bot.csv is missing 'application_url' column")
+        for chunk in read_csv_chunks(SOURCE_FILE, chunksize=CHUNK_SIZE):
+            kept = chunk[~store.expired_mask(chunk[URL_COLUMN])]
+            kept.to_csv(OUTPUT_FILE, mode="a", header=False, index=False)
+            source_rows += len(chunk)
+            kept_rows += len(kept)
 
-# Convert URLs to sets for fast lookup
-expired_urls = set(expired_df["application_url"].dropna().unique())
+    return source_rows, kept_rows
 
-# Filter source jobs (keep only non-expired)
-filtered_source_df = source_df[
-    ~source_df["application_url"].isin(expired_urls)
-]
+def main():
+    if USE_EXPIRED_STORE:
+        source_rows, kept_rows = filter_with_store()
+    elif STREAMING:
+        source_rows, kept_rows = filter_streaming()
+    else:
+        source_rows, kept_rows = filter_in_memory()
 
-# Save output
-filtered_source_df.to_csv(OUTPUT_FILE, index=False)
+    print("✅ Filtering complete!")
+    print(f"Original source rows: {source_rows}")
+    print(f"Expired URLs removed: {source_rows - kept_rows}")
+    print(f"Remaining active jobs: {kept_rows}")
+    print(f"📄 Output saved as: {OUTPUT_FILE}")
 
-print("✅ Filtering complete!")
-print(f"Original source rows: {len(source_df)}")
-print(f"Expired URLs removed: {len(source_df) - len(filtered_source_df)}")
-print(f"Remaining active jobs: {len(filtered_source_df)}")
-print(f"📄 Output saved as: {OUTPUT_FILE}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Expired Job Store
+Persistent, indexed record of expired jobs keyed by canonical job ID.
+
+Replaces re-reading the ever-growing expired_jobs_bot2.csv on every run:
+- job_clean.py appends newly expired jobs after each cleaning pass
+- expired_jobs_filter.py looks up source URLs against the index, so filtering
+  costs O(source rows) no matter how long the expired history gets
+
+Run this script directly to import a legacy expired CSV and compact the store.
+"""
+
+import hashlib
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pandas as pd
+
+# ---------- CONFIG ----------
+STORE_PATH = "expired_jobs.db"
+
+# Old running doc; rows appended since the last run are imported (skipped if
+# it doesn't exist)
+LEGACY_EXPIRED_CSV = "expired_jobs_bot2.csv"
+
+URL_COLUMN = "application_url"
+
+# Drop entries older than this many days when compacting (None = keep all).
+# Only prunes the store: rows still in LEGACY_EXPIRED_CSV come back with a
+# fresh date if that file is ever fully re-imported, so trim it too.
+COMPACT_OLDER_THAN_DAYS = None
+
+CHUNK_SIZE = 100_000
+
+# SQLite caps the number of "?" placeholders per statement
+LOOKUP_BATCH_SIZE = 500
+
+# Bytes just before the imported offset that must be unchanged for an
+# appended-to CSV to be imported from that offset instead of from the start
+CHECKSUM_BYTES = 4096
+
+# LinkedIn job URLs come in many shapes, all carrying the same numeric ID:
+#   /jobs/view/1234567890, /jobs/view/software-engineer-at-acme-1234567890/
+#   /jobs/search/?currentJobId=1234567890, /jobs/collections/...?currentJobId=...
+# Only the URL's own path and query are looked at, never a URL nested in a
+# redirect parameter.
+LINKEDIN_JOB_PATH_RE = re.compile(r"^/jobs/view/(?:[^/]*-)?(\d+)(?:/|$)")
+LINKEDIN_JOB_ID_PARAMS = ("currentJobId", "jobId")
+
+# Query params that never change which job a URL points to
+TRACKING_PARAMS = {"refid", "trackingid", "trk", "ref", "src", "source", "gclid", "fbclid"}
+
+
+def canonical_job_id(url):
+    """
+    Map a job URL to a stable ID so variants of the same posting match.
+    LinkedIn URLs become "linkedin:<job id>"; anything else becomes
+    "url:<host><path>?<query>" with scheme, "www.", fragment, trailing slash
+    and tracking params removed. Returns None for blank/missing URLs.
+    """
+    if not isinstance(url, str):
+        return None
+    url = url.strip()
+    if not url:
+        return None
+
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        match = LINKEDIN_JOB_PATH_RE.match(parts.path)
+        if match:
+            return f"linkedin:{match.group(1)}"
+        values = dict(params)
+        for param in LINKEDIN_JOB_ID_PARAMS:
+            if values.get(param, "").isdigit():
+                return f"linkedin:{values[param]}"
+
+    query = sorted(
+        (key, value)
+        for key, value in params
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    canonical = f"url:{host}{parts.path.rstrip('/')}"
+    if query:
+        canonical += f"?{urlencode(query)}"
+    return canonical
+
+
+def _last_line_end(csv_path, size):
+    """
+    Byte offset just past the last newline in the first size bytes, so an
+    unterminated last line is read again once it is finished.
+    """
+    with open(csv_path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def _checksum_before(csv_path, offset):
+    with open(csv_path, "rb") as f:
+        f.seek(max(0, offset - CHECKSUM_BYTES))
+        return hashlib.sha256(f.read(min(offset, CHECKSUM_BYTES))).hexdigest()
+
+
+class ExpiredJobStore:
+    """
+    Append-only SQLite store of expired jobs. Each canonical job ID is kept
+    once (first sighting wins), with the original URL and when it was added.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS expired_jobs (
+                job_id TEXT PRIMARY KEY,
+                application_url TEXT,
+                added_at TEXT NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        # Which CSVs were imported, what they looked like at the time, and up
+        # to which byte (end of the last complete line) they were read
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS csv_imports (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                imported_at TEXT NOT NULL,
+                offset INTEGER,
+                checksum TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(csv_imports)")}
+        for column, kind in (("offset", "INTEGER"), ("checksum", "TEXT")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE csv_imports ADD COLUMN {column} {kind}")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM expired_jobs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def add_urls(self, urls):
+        """
+        Insert expired job URLs. Returns how many new job IDs were added.
+        """
+        added_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for url in urls:
+            job_id = canonical_job_id(url)
+            if job_id:
+                rows.append((job_id, url.strip(), added_at))
+
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO expired_jobs (job_id, application_url, added_at) VALUES (?, ?, ?)",
+            rows,
+        )
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def add_from_csv(self, csv_path, expired_only=False, offset=None):
+        """
+        Insert the URLs from a CSV in chunks. With expired_only=True only rows
+        where expired is True are taken (e.g. job_clean.py output, which also
+        carries "Unknown" rows). With offset, only rows starting at that byte
+        (the start of a line) are read. Returns how many new job IDs were added.
+        """
+        columns = [URL_COLUMN, "expired"] if expired_only else [URL_COLUMN]
+        header = pd.read_csv(csv_path, nrows=0).columns
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise ValueError(f"{csv_path} is missing columns: {missing}")
+
+        with open(csv_path, "rb") as f:
+            if offset:
+                f.seek(offset)
+                if not f.read(1):
+                    return 0
+                f.seek(offset)
+                chunks = pd.read_csv(
+                    f, header=None, names=list(header), usecols=columns,
+                    dtype=str, chunksize=CHUNK_SIZE,
+                )
+            else:
+                chunks = pd.read_csv(f, usecols=columns, dtype=str, chunksize=CHUNK_SIZE)
+
+            added = 0
+            for chunk in chunks:
+                if expired_only:
+                    chunk = chunk[chunk["expired"] == "True"]
+                added += self.add_urls(chunk[URL_COLUMN].dropna())
+        return added
+
+    def sync_csv(self, csv_path, expired_only=False):
+        """
+        Import what's new in csv_path since the last import, e.g. the running
+        expired CSV that people keep appending to. Rows appended after the
+        last imported line are read from that byte offset; the whole file is
+        only re-read if it is new, shrank, or changed before that offset.
+        Re-importing is safe: known job IDs are ignored. Returns how many new
+        job IDs were added, or None if the file was unchanged.
+        """
+        csv_path = Path(csv_path)
+        stat = csv_path.stat()
+        key = str(csv_path.resolve())
+        row = self.conn.execute(
+            "SELECT mtime, size, offset, checksum FROM csv_imports WHERE path = ?", (key,)
+        ).fetchone()
+        if row is not None and row[:2] == (stat.st_mtime, stat.st_size):
+            return None
+
+        offset = None
+        if row is not None and row[2] is not None and row[2] <= stat.st_size:
+            if _checksum_before(csv_path, row[2]) == row[3]:
+                offset = row[2]
+
+        added = self.add_from_csv(csv_path, expired_only=expired_only, offset=offset)
+        end = _last_line_end(csv_path, stat.st_size)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO csv_imports (path, mtime, size, imported_at, offset, checksum) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key, stat.st_mtime, stat.st_size, datetime.now(timezone.utc).isoformat(),
+                end, _checksum_before(csv_path, end),
+            ),
+        )
+        self.conn.commit()
+        return added
+
+    def expired_ids(self, job_ids):
+        """
+        Return the subset of job_ids that are in the store.
+        """
+        job_ids = list(job_ids)
+        found = set()
+        for start in range(0, len(job_ids), LOOKUP_BATCH_SIZE):
+            batch = job_ids[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                row[0]
+                for row in self.conn.execute(
+                    f"SELECT job_id FROM expired_jobs WHERE job_id IN ({placeholders})",
+                    batch,
+                )
+            )
+        return found
+
+    def contains(self, url):
+        job_id = canonical_job_id(url)
+        return bool(job_id) and bool(self.expired_ids([job_id]))
+
+    def expired_mask(self, urls):
+        """
+        Boolean Series aligned with the urls Series: True where the job is expired.
+        """
+        job_ids = urls.map(canonical_job_id)
+        found = self.expired_ids(job_ids.dropna().unique())
+        return job_ids.isin(found)
+
+    def compact(self, older_than_days=None):
+        """
+        Optionally drop entries older than older_than_days, then rebuild the
+        database file to reclaim space. Returns how many entries were dropped.
+        Pruned jobs that are still in a synced CSV come back (with a new
+        added_at) if that CSV is ever re-imported in full.
+        """
+        dropped = 0
+        if older_than_days is not None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+            dropped = self.conn.execute(
+                "DELETE FROM expired_jobs WHERE added_at < ?", (cutoff,)
+            ).rowcount
+            self.conn.commit()
+        self.conn.execute("VACUUM")
+        return dropped
+
+
+if __name__ == "__main__":
+    with ExpiredJobStore(STORE_PATH) as store:
+        if Path(LEGACY_EXPIRED_CSV).exists():
+            added = store.sync_csv(LEGACY_EXPIRED_CSV)
+            if added is None:
+                print(f"📥 {LEGACY_EXPIRED_CSV} unchanged since last import")
+            else:
+                print(f"📥 Imported {added} new expired jobs from {LEGACY_EXPIRED_CSV}")
+
+        dropped = store.compact(COMPACT_OLDER_THAN_DAYS)
+        print(f"🧹 Compacted store (dropped {dropped} old entries)")
+        print(f"📦 {STORE_PATH}: {len(store)} expired jobs")
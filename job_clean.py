@@ -2,6 +2,8 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
+from expired_store import STORE_PATH, ExpiredJobStore
+
 # =============================================================================
 # 🧹 JOB RESULTS CLEANER
 # =============================================================================
@@ -23,6 +25,10 @@ OUTPUT_CSV = "final_cleaned_job_results_1.csv"
 # Columns to keep in output
 OUTPUT_COLUMNS = ["company_name", "title", "application_url", "expired"]
 
+# Append confirmed expired jobs (expired = True, not "Unknown") to the
+# expired job store used by expired_jobs_filter.py
+UPDATE_EXPIRED_STORE = True
+
 def clean_job_results():
     """
     Clean the LinkedIn job check results to only show expired and unknown jobs.
@@ -67,6 +73,12 @@ def clean_job_results():
     df_output.to_csv(output_path, index=False, encoding='utf-8')
     
     print(f"\n✅ Cleaned results saved to: {OUTPUT_CSV}")
+
+    # Step 5: Record expired jobs in the indexed store
+    if UPDATE_EXPIRED_STORE and {'application_url', 'expired'} <= set(df_output.columns):
+        with ExpiredJobStore(STORE_PATH) as store:
+            added = store.add_from_csv(output_path, expired_only=True)
+            print(f"📦 Added {added} new expired jobs to {STORE_PATH} ({len(store)} total)")
     
     # Summary statistics
     print("\n📊 Summary:")
@@ -0,0 +1,218 @@
+"""
+Research Tasks
+Task model and extraction tiers for agent.py, kept free of browser_use so
+they can be exercised offline with saved HTML and a stubbed agent/LLM.
+
+Each task is answered by the cheapest tier that works:
+1. cached result for the same page content (agent_cache.py)
+2. rule-based extraction from the raw HTML (staff_extract.py)
+3. the browser_use Agent, passed in by agent.py as run_agent
+"""
+
+import asyncio
+import csv
+import json
+import keyword
+import re
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List
+
+from pydantic import BaseModel, create_model
+
+from agent_cache import UNVERIFIED_RESULT_TTL_S, result_key
+from staff_extract import (
+    MIN_COVERAGE,
+    StaffRows,
+    extract_staff_rows,
+    fetch_html,
+    page_contains_rows,
+    page_fingerprint,
+)
+
+STAFF_FIELDS = ["name", "position", "email"]
+
+RESERVED_FIELD_NAMES = set(dir(BaseModel))
+
+# Per-task columns that batch results carry next to the extracted fields
+RESULT_META_COLUMNS = ["task_id", "url", "status", "method", "attempts", "error"]
+
+
+class ResearchTask(BaseModel):
+    id: str
+    url: str
+    fields: List[str] = STAFF_FIELDS
+    record_type: str = "staff"
+    instructions: str = ""
+
+
+def validate_fields(fields):
+    """
+    Raise ValueError unless every field can be a pydantic model field.
+    """
+    if not fields:
+        raise ValueError("no fields given")
+    seen = set()
+    for field in fields:
+        if not isinstance(field, str):
+            raise ValueError(f"field {field!r} is not a string")
+        if not field.isidentifier() or keyword.iskeyword(field) or field.startswith("_"):
+            raise ValueError(f"field {field!r} is not a valid identifier")
+        if field in RESERVED_FIELD_NAMES or field.startswith("model_"):
+            raise ValueError(f"field {field!r} clashes with a pydantic BaseModel attribute")
+        if field in RESULT_META_COLUMNS:
+            raise ValueError(f"field {field!r} clashes with a batch result column")
+        if field in seen:
+            raise ValueError(f"field {field!r} is listed twice")
+        seen.add(field)
+
+
+def make_rows_model(fields):
+    """
+    Pydantic output model for an extraction schema: {'rows': [{field: str}]}.
+    """
+    validate_fields(fields)
+    if list(fields) == STAFF_FIELDS:
+        return StaffRows
+    row_model = create_model("Row", **{field: (str, ...) for field in fields})
+    return create_model("Rows", rows=(List[row_model], ...))
+
+
+def build_prompt(task):
+    shape = "{'rows':[{" + ",".join(f"'{field}':'...'" for field in task.fields) + "}]}"
+    prompt = (
+        f"Visit {task.url} and extract {task.record_type} records. "
+        "Return JSON only in this exact shape: "
+        f"{shape}. "
+        "Include only rows where all values are present."
+    )
+    if task.instructions:
+        prompt += f" {task.instructions}"
+    return prompt
+
+
+def parse_fields(value):
+    if value is None or value == "":
+        return STAFF_FIELDS
+    if isinstance(value, str):
+        value = re.split(r"[|,]", value)
+    if not isinstance(value, list):
+        raise ValueError(f"expected a list or a '|'-separated string, got {value!r}")
+    for field in value:
+        if not isinstance(field, str):
+            raise ValueError(f"field {field!r} is not a string")
+    fields = [field.strip() for field in value if field.strip()]
+    validate_fields(fields)
+    return fields
+
+
+def load_tasks(path):
+    """
+    Read batch tasks from a .csv or .jsonl/.ndjson file.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Tasks file not found: {path.resolve()}")
+
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            raw_tasks = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            raw_tasks = list(csv.DictReader(f))
+
+    tasks = []
+    for i, raw in enumerate(raw_tasks, start=1):
+        url = (raw.get("url") or "").strip()
+        if not url:
+            raise ValueError(f"Task {i} in {path} has no 'url'")
+        try:
+            fields = parse_fields(raw.get("fields"))
+        except ValueError as e:
+            raise ValueError(f"Task {i} in {path} has invalid 'fields': {e}") from e
+        tasks.append(ResearchTask(
+            id=str(raw.get("id") or i),
+            url=url,
+            fields=fields,
+            record_type=raw.get("record_type") or "staff",
+            instructions=raw.get("instructions") or "",
+        ))
+    return tasks
+
+
+async def fetch_page(task):
+    """
+    Raw HTML for the fast path and the cache fingerprint, or None.
+    """
+    try:
+        return await asyncio.to_thread(fetch_html, task.url)
+    except Exception as e:
+        print(f"   ↪ Could not fetch {task.url} directly ({type(e).__name__}: {e}), using agent")
+        return None
+
+
+async def try_fast_path(task, html):
+    """
+    Returns StaffRows extracted without the agent, or None when the agent
+    should handle the page instead.
+    """
+    if list(task.fields) != STAFF_FIELDS:
+        return None
+
+    parsed, coverage = await asyncio.to_thread(extract_staff_rows, html)
+    if parsed is None or coverage < MIN_COVERAGE:
+        print(
+            f"   ↪ Fast path found no confident directory on {task.url} "
+            f"({coverage:.0%} of emails covered), using agent"
+        )
+        return None
+    return parsed
+
+
+def task_result_key(task, fingerprint):
+    # Everything build_prompt puts in the prompt, so tasks asking for
+    # different things on the same page never share a cached result
+    return result_key(task.url, task.fields, fingerprint, task.record_type, task.instructions)
+
+
+def save_result(cache, task, fingerprint, parsed, ttl_s=None):
+    if cache is not None and fingerprint is not None:
+        cache.put(
+            "result",
+            task_result_key(task, fingerprint),
+            parsed.model_dump_json(),
+            ttl_s=ttl_s,
+        )
+
+
+async def extract_task(task, run_agent, cache=None, fast_path=True, fetch_slots=None):
+    """
+    Answer one task with the cheapest tier that works. run_agent(fingerprint)
+    is an async callable that drives the browser agent and returns the rows
+    model, or None once it has given up. Returns (parsed or None, method).
+    """
+    html = None
+    if fast_path or cache is not None:
+        async with fetch_slots or nullcontext():
+            html = await fetch_page(task)
+    fingerprint = await asyncio.to_thread(page_fingerprint, html) if html is not None else None
+
+    if cache is not None and fingerprint is not None:
+        data = cache.get("result", task_result_key(task, fingerprint))
+        if data is not None:
+            return make_rows_model(task.fields).model_validate_json(data), "cache"
+
+    if fast_path and html is not None:
+        parsed = await try_fast_path(task, html)
+        if parsed is not None:
+            save_result(cache, task, fingerprint, parsed)
+            return parsed, "rules"
+
+    parsed = await run_agent(fingerprint)
+    if parsed is not None and cache is not None and html is not None:
+        # The agent saw the rendered page; the fingerprint only covers the
+        # fetched HTML, so trust it for long only if that HTML has the rows
+        rows = [row.model_dump() for row in parsed.rows]
+        verified = await asyncio.to_thread(page_contains_rows, html, rows)
+        save_result(cache, task, fingerprint, parsed, None if verified else UNVERIFIED_RESULT_TTL_S)
+    return parsed, "agent"
@@ -0,0 +1,451 @@
+"""
+Staff Directory Extractor
+Rule-based fast path for agent.py: fetch a page's HTML and pull
+name / position / email rows out of tables, lists and cards directly,
+without a browser or an LLM.
+
+Pages where this doesn't find enough rows (JS-rendered directories,
+unusual layouts) fall back to the browser_use Agent in agent.py.
+Works on plain HTML strings, so saved pages can be checked offline:
+
+    rows, coverage = extract_staff_rows(Path("page.html").read_text())
+"""
+
+import hashlib
+import re
+from html.parser import HTMLParser
+from typing import List
+
+import requests
+from pydantic import BaseModel, ValidationError
+
+# ---------- CONFIG ----------
+FETCH_TIMEOUT_S = 30
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+
+# Share of the page's email addresses that must end up in a complete row
+# before the fast path result is trusted
+MIN_COVERAGE = 0.8
+
+# Rows needed outside the page header/footer/nav before the page counts as a
+# directory. A lone contact card (say the principal in the footer of a
+# JS-rendered page whose directory never reaches the HTML) goes to the agent.
+MIN_ROWS = 3
+
+# A record with more text pieces than this is a page section, not a card
+MAX_RECORD_TEXTS = 8
+
+# Shared mailboxes (footer "Contact us" etc.) don't count against coverage
+GENERIC_MAILBOXES = {"info", "office", "contact", "admin", "webmaster", "support", "noreply", "no-reply", "hello", "frontdesk"}
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+# Elements that can hold one staff record
+RECORD_TAGS = {"tr", "li", "div", "p", "article", "section", "dl", "figure", "address"}
+SKIP_TAGS = {"script", "style", "noscript", "template", "head", "svg"}
+
+# Tags that end a piece of text. Inline tags (a, span, strong, em, b, i...)
+# don't, so "<strong>Jane</strong> Doe" stays one "Jane Doe" segment.
+BOUNDARY_TAGS = RECORD_TAGS | {
+    "td", "th", "table", "thead", "tbody", "tfoot", "ul", "ol", "dt", "dd",
+    "h1", "h2", "h3", "h4", "h5", "h6", "br", "hr", "header", "footer",
+    "nav", "main", "aside", "blockquote", "figcaption",
+}
+
+# Page chrome: records inside these (or inside an element whose class/id is
+# one of CHROME_NAMES) are site-wide contact blocks, not the directory
+CHROME_TAGS = {"header", "footer", "nav", "aside"}
+CHROME_NAMES = {
+    "header", "site-header", "page-header", "masthead", "footer", "site-footer",
+    "page-footer", "nav", "navbar", "site-nav", "sidebar", "topbar",
+}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Labels that sit next to values in cards ("Email:", "Phone") - not data
+LABEL_WORDS = {"email", "e-mail", "mail", "phone", "tel", "telephone", "fax", "ext", "contact", "name", "position", "title", "role"}
+
+# Words that show a Title Case heading is a place or section, not a person
+NON_NAME_WORDS = {
+    "main", "front", "desk", "office", "team", "staff", "our", "meet", "the",
+    "directory", "contact", "us", "about", "school", "department", "services",
+    "center", "welcome", "home", "menu", "faculty", "administration", "board",
+    "members", "information", "hours", "location", "general", "inquiries",
+}
+
+POSITION_WORDS = {
+    "teacher", "principal", "assistant", "director", "manager", "coordinator",
+    "counselor", "secretary", "coach", "specialist", "officer", "president",
+    "head", "dean", "clerk", "administrator", "librarian", "nurse", "chair",
+    "supervisor", "advisor", "instructor", "professor", "lead", "registrar",
+    "treasurer", "bookkeeper", "custodian", "psychologist", "therapist",
+    "aide", "paraprofessional", "technician", "engineer", "analyst",
+    "executive", "vice", "chief", "staff", "department", "grade", "math",
+    "science", "english", "reading", "history", "art", "music", "physical",
+    "education", "ese", "esol", "media", "security", "cafeteria", "office",
+    "receptionist", "attendance", "liaison", "interventionist", "facilitator",
+    "representative", "associate", "consultant", "recruiter", "developer",
+    "designer", "accountant", "attorney", "paralegal", "owner", "founder",
+}
+
+HONORIFICS = {"mr", "mrs", "ms", "miss", "dr", "prof", "coach", "jr", "sr"}
+
+PHONE_RE = re.compile(r"^[\d\s().+\-x/ext:]{7,}$", re.IGNORECASE)
+NAME_TOKEN_RE = re.compile(r"^(?:[A-Z][A-Za-z'’\-]*\.?|de|del|la|van|von|da|di)$")
+
+
+class StaffRow(BaseModel):
+    name: str
+    position: str
+    email: str
+
+class StaffRows(BaseModel):
+    rows: List[StaffRow]
+
+
+def fetch_html(url):
+    response = requests.get(url, timeout=FETCH_TIMEOUT_S, headers={"User-Agent": USER_AGENT})
+    response.raise_for_status()
+    return response.text
+
+
+def decode_cfemail(encoded):
+    """
+    Decode a Cloudflare-obfuscated address (data-cfemail / email-protection#...).
+    """
+    try:
+        key = int(encoded[:2], 16)
+        return "".join(
+            chr(int(encoded[i:i + 2], 16) ^ key) for i in range(2, len(encoded), 2)
+        )
+    except ValueError:
+        return ""
+
+
+def is_chrome(tag, attrs):
+    if tag in CHROME_TAGS:
+        return True
+    names = f"{attrs.get('class') or ''} {attrs.get('id') or ''}".lower().split()
+    return any(name in CHROME_NAMES for name in names)
+
+
+class _Record:
+    def __init__(self, tag, segments, cells, header, chrome):
+        self.tag = tag
+        self.segments = segments  # [("text" | "email", value)]
+        self.cells = cells        # table cell texts, for <tr> only
+        self.header = header      # table header labels, for <tr> only
+        self.chrome = chrome      # inside the page header/footer/nav
+
+    @property
+    def emails(self):
+        return list(dict.fromkeys(value for kind, value in self.segments if kind == "email"))
+
+    @property
+    def texts(self):
+        return [value for kind, value in self.segments if kind == "text"]
+
+
+class _DirectoryParser(HTMLParser):
+    """
+    Splits the page into text/email segments and remembers which segments
+    each record-like element (row, list item, card) spans.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.segments = []
+        self.buffer = []
+        self.stack = []        # (tag, first segment index, in chrome)
+        self.open_tags = []    # (tag, is chrome) of every open element
+        self.tables = []       # header labels of each open table
+        self.row_cells = None  # cells of the open <tr>
+        self.row_has_td = False
+        self.cell_start = None
+        self.skip_depth = 0
+        self.records = []
+
+    def flush(self):
+        text = " ".join(" ".join(self.buffer).split())
+        self.buffer = []
+        if not text:
+            return
+        for email in EMAIL_RE.findall(text):
+            self.segments.append(("email", email.lower()))
+        text = EMAIL_RE.sub(" ", text).strip(" ,;:|-–")
+        if text:
+            self.segments.append(("text", text))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag in BOUNDARY_TAGS:
+            self.flush()
+        attrs = dict(attrs)
+        if tag not in VOID_TAGS:
+            self.open_tags.append((tag, is_chrome(tag, attrs)))
+
+        href = attrs.get("href") or ""
+        if href.lower().startswith("mailto:"):
+            email = href[7:].split("?")[0].strip()
+            if EMAIL_RE.fullmatch(email):
+                self.segments.append(("email", email.lower()))
+        elif "email-protection#" in href:
+            email = decode_cfemail(href.split("#", 1)[1])
+            if EMAIL_RE.fullmatch(email):
+                self.segments.append(("email", email.lower()))
+        if attrs.get("data-cfemail"):
+            email = decode_cfemail(attrs["data-cfemail"])
+            if EMAIL_RE.fullmatch(email):
+                self.segments.append(("email", email.lower()))
+
+        if tag == "table":
+            self.tables.append([])
+        elif tag == "tr":
+            self.row_cells = []
+            self.row_has_td = False
+        elif tag in ("td", "th") and self.row_cells is not None:
+            self.row_has_td |= tag == "td"
+            self.cell_start = len(self.segments)
+
+        if tag in RECORD_TAGS:
+            chrome = any(chrome for _, chrome in self.open_tags)
+            self.stack.append((tag, len(self.segments), chrome))
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth:
+            return
+        if tag in BOUNDARY_TAGS:
+            self.flush()
+        for depth in range(len(self.open_tags) - 1, -1, -1):
+            if self.open_tags[depth][0] == tag:
+                del self.open_tags[depth:]
+                break
+
+        if tag in ("td", "th") and self.row_cells is not None and self.cell_start is not None:
+            cell = self.segments[self.cell_start:]
+            self.row_cells.append(" ".join(
+                value for kind, value in cell if kind == "text"
+            ) or " ".join(value for kind, value in cell if kind == "email"))
+            self.cell_start = None
+        elif tag == "table" and self.tables:
+            self.tables.pop()
+
+        if tag not in RECORD_TAGS:
+            return
+        # Close the innermost matching element (tolerates unclosed tags)
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                _, start, chrome = self.stack[depth]
+                del self.stack[depth:]
+                break
+        else:
+            return
+
+        cells, header = None, None
+        if tag == "tr":
+            cells = self.row_cells or []
+            if self.tables:
+                if not self.row_has_td and not self.tables[-1]:
+                    self.tables[-1] = [label.lower() for label in cells]
+                header = self.tables[-1]
+            self.row_cells = None
+        self.records.append(_Record(tag, self.segments[start:], cells, header, chrome))
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.buffer.append(data)
+
+    def close(self):
+        super().close()
+        self.flush()
+
+
+def page_fingerprint(html):
+    """
+    Hash of the page's visible text and email addresses. Scripts, styles and
+    markup are ignored, so per-request noise (nonces, tracking tags) doesn't
+    change it but any edit to the directory content does.
+    """
+    parser = _DirectoryParser()
+    parser.feed(html)
+    parser.close()
+    content = "\n".join(f"{kind}:{value}" for kind, value in parser.segments)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def page_contains_rows(html, rows):
+    """
+    True when the static HTML itself carries every extracted row: its email,
+    or (for schemas without one) every value. Only then does page_fingerprint
+    of that HTML say anything about whether the rows are still current.
+    """
+    if not rows:
+        return False
+    parser = _DirectoryParser()
+    parser.feed(html)
+    parser.close()
+    emails = {value for kind, value in parser.segments if kind == "email"}
+    text = " ".join(value for _, value in parser.segments).lower()
+
+    for row in rows:
+        if "email" in row:
+            if str(row["email"]).strip().lower() not in emails:
+                return False
+        elif not all(" ".join(str(value).split()).lower() in text for value in row.values()):
+            return False
+    return True
+
+
+def is_label(text):
+    return text.lower().rstrip(":").strip() in LABEL_WORDS
+
+
+def has_position_word(text):
+    return any(word in POSITION_WORDS for word in re.findall(r"[a-z]+", text.lower()))
+
+
+def looks_like_name(text):
+    # Position words are allowed here: "Grace Head" and "Art Dean" are names
+    tokens = text.replace(",", " ").split()
+    if not 2 <= len(tokens) <= 5 or any(ch.isdigit() for ch in text):
+        return False
+    if any(token.lower().strip(".,") in NON_NAME_WORDS for token in tokens):
+        return False
+    return all(NAME_TOKEN_RE.match(token) for token in tokens)
+
+
+def email_matches_name(email, name):
+    """
+    True when the mailbox is visibly built from the name: jdoe@, jane.doe@,
+    doej@, jd@...
+    """
+    local = re.sub(r"[^a-z]", "", email.split("@")[0].lower())
+    tokens = [token for token in re.findall(r"[a-z]+", name.lower()) if token not in HONORIFICS]
+    if not local or not tokens:
+        return False
+    if any(len(token) >= 3 and token in local for token in tokens):
+        return True
+    return local == "".join(token[0] for token in tokens)
+
+
+def position_word_share(text):
+    words = re.findall(r"[a-z]+", text.lower())
+    return sum(word in POSITION_WORDS for word in words) / len(words) if words else 0.0
+
+
+def _column(header, *keywords):
+    for i, label in enumerate(header):
+        if any(keyword in label for keyword in keywords):
+            return i
+    return None
+
+
+def _row_from_table(record, email):
+    header, cells = record.header, record.cells
+    if not header or len(cells) != len(header):
+        return None
+
+    first, last = _column(header, "first"), _column(header, "last")
+    name_col = _column(header, "name")
+    position_col = _column(header, "position", "title", "role", "job", "assignment", "subject")
+    if position_col is None:
+        return None
+
+    if first is not None and last is not None:
+        name = f"{cells[first]} {cells[last]}".strip()
+    elif name_col is not None:
+        name = cells[name_col]
+    else:
+        return None
+    return {"name": name, "position": cells[position_col], "email": email}
+
+
+def _row_from_texts(texts, email):
+    """
+    Name/position from a card's loose texts. Only returned when something
+    backs it up - the mailbox matches the name, or the position contains a
+    known position word - since Title Case headings ("Front Desk") look like
+    names too. Unconfirmed rows are dropped, so they neither get exported
+    nor count toward MIN_COVERAGE.
+    """
+    candidates = [
+        text for text in texts
+        if not is_label(text) and not PHONE_RE.match(text)
+    ]
+    # Cards often use "Email: x@y.org" or "Position: Teacher" - drop the label
+    candidates = [re.sub(r"^(?:position|title|role|name)\s*:\s*", "", text, flags=re.IGNORECASE) for text in candidates]
+
+    if len(candidates) == 1:
+        # "Jane Doe - Principal" / "Jane Doe, Principal" / "Jane Doe | Principal | Email"
+        parts = [
+            part.strip() for part in re.split(r"\s+[-–|]\s+|,\s+", candidates[0])
+            if part.strip() and not is_label(part) and not PHONE_RE.match(part)
+        ]
+        candidates = parts if len(parts) >= 2 else candidates
+
+    names = [text for text in candidates if looks_like_name(text)]
+    if not names:
+        return None
+    # "Grace Head" vs "Art Teacher": the one made of fewer position words is
+    # the person (ties go to the earlier text, names usually come first)
+    matching = [text for text in names if email_matches_name(email, text)]
+    name = matching[0] if matching else min(names, key=position_word_share)
+    others = [text for text in candidates if text != name]
+    position = next((text for text in others if has_position_word(text)), None)
+    if position is None and others:
+        position = others[0]
+    if position is None:
+        return None
+    if not (email_matches_name(email, name) or has_position_word(position)):
+        return None
+    return {"name": name, "position": position, "email": email}
+
+
+def extract_staff_rows(html):
+    """
+    Returns (StaffRows or None, coverage), where coverage is the share of
+    distinct email addresses on the page that ended up in a complete,
+    confirmed row (header-mapped table row, or a card passing _row_from_texts).
+    Returns None unless at least MIN_ROWS rows come from outside page chrome.
+    """
+    parser = _DirectoryParser()
+    parser.feed(html)
+    parser.close()
+
+    page_emails = {value for kind, value in parser.segments if kind == "email"}
+    if not page_emails:
+        return None, 0.0
+
+    # Records close innermost-first, so the tightest element around each
+    # email that also holds usable text wins
+    rows = {}
+    content_rows = 0
+    for record in parser.records:
+        emails = record.emails
+        if len(emails) != 1 or emails[0] in rows or len(record.texts) > MAX_RECORD_TEXTS:
+            continue
+        email = emails[0]
+        row = _row_from_table(record, email) if record.tag == "tr" else None
+        if row is None:
+            row = _row_from_texts(record.texts, email)
+        if row and all(value.strip() for value in row.values()):
+            rows[email] = row
+            content_rows += not record.chrome
+
+    personal_emails = {
+        email for email in page_emails
+        if email in rows or email.split("@")[0] not in GENERIC_MAILBOXES
+    }
+    coverage = len(rows) / len(personal_emails) if personal_emails else 0.0
+    if content_rows < MIN_ROWS:
+        return None, coverage
+    try:
+        return StaffRows.model_validate({"rows": list(rows.values())}), coverage
+    except ValidationError:
+        return None, coverage
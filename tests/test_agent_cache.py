@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel
+
+import agent_cache
+from agent_cache import AgentCache, CachedLLM
+from staff_extract import StaffRows
+
+ROWS_JSON = '{"rows": [{"name": "Kim Lane", "position": "Dean", "email": "klane@school.org"}]}'
+
+
+# Shaped like browser_use's message and completion models
+class TextPart(BaseModel):
+    type: Literal["text"] = "text"
+    text: str
+
+
+class ImagePart(BaseModel):
+    type: Literal["image_url"] = "image_url"
+    image_url: dict
+
+
+class UserMessage(BaseModel):
+    role: Literal["user"] = "user"
+    content: Union[str, List[Union[TextPart, ImagePart]]]
+
+
+class Completion(BaseModel):
+    completion: Union[StaffRows, str]
+    usage: Optional[dict] = None
+
+
+class StubChatModel:
+    model = "stub-model"
+    provider = "stub"
+    name = "stub-model"
+    model_name = "stub-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages, output_format=None, **kwargs):
+        self.calls += 1
+        return Completion(completion=output_format.model_validate_json(ROWS_JSON), usage={"tokens": 1})
+
+
+def step_messages(step, tab_id, screenshot, page_text="Staff: Kim Lane, Dean, klane@school.org"):
+    state = (
+        f"<step_info>Step {step} of 25 max possible steps\n"
+        f"Current date and time: 2025-06-0{step} 10:1{step}</step_info>\n"
+        f"Tab {tab_id}: https://school.org/staff\n"
+        f"{page_text}"
+    )
+    return [
+        UserMessage(content="Visit https://school.org/staff and extract staff records."),
+        UserMessage(content=[
+            TextPart(text=state),
+            ImagePart(image_url={"url": f"data:image/png;base64,{screenshot}"}),
+        ]),
+    ]
+
+
+def ask(llm, messages):
+    return asyncio.run(llm.ainvoke(messages, StaffRows))
+
+
+def test_volatile_message_parts_still_hit(tmp_path):
+    stub = StubChatModel()
+    with AgentCache(tmp_path / "cache.db") as cache:
+        llm = CachedLLM(stub, cache, "fp", completion_cls=Completion)
+        first = ask(llm, step_messages(1, "a1b2", "iVBORw0KGgoAAA"))
+        second = ask(llm, step_messages(2, "c3d4", "iVBORw0KGgoBBB"))
+
+        assert stub.calls == 1
+        assert cache.hits["llm"] == 1
+        assert second.usage is None
+        assert second.completion == first.completion
+
+
+def test_different_page_text_misses(tmp_path):
+    stub = StubChatModel()
+    with AgentCache(tmp_path / "cache.db") as cache:
+        llm = CachedLLM(stub, cache, "fp", completion_cls=Completion)
+        ask(llm, step_messages(1, "a1b2", "AAA"))
+        ask(llm, step_messages(1, "a1b2", "AAA", page_text="Staff: Ann Cole, Principal"))
+        assert stub.calls == 2
+        assert cache.hits["llm"] == 0
+
+
+def test_chat_model_attributes_pass_through(tmp_path):
+    with AgentCache(tmp_path / "cache.db") as cache:
+        llm = CachedLLM(StubChatModel(), cache, "fp")
+        assert (llm.model, llm.provider, llm.name, llm.model_name) == (
+            "stub-model", "stub", "stub-model", "stub-model"
+        )
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch, tmp_path):
+    clock = itertools.count(1_000_000)
+    monkeypatch.setattr(agent_cache.time, "time", lambda: next(clock))
+    with AgentCache(tmp_path / "cache.db", max_entries=2) as cache:
+        cache.put("llm", "a", "1")
+        cache.put("llm", "b", "2")
+        cache.get("llm", "a")
+        cache.put("llm", "c", "3")
+        assert cache.get("llm", "b") is None
+        assert cache.get("llm", "a") == "1"
+        assert cache.get("llm", "c") == "3"
@@ -0,0 +1,181 @@
+import asyncio
+import csv
+import json
+
+from batch_runner import BrowserSessionPool, ResultWriter, run_with_retries
+from research_tasks import ResearchTask
+from staff_extract import StaffRows
+
+ROWS = StaffRows.model_validate(
+    {"rows": [{"name": "Kim Lane", "position": "Dean", "email": "klane@school.org"}]}
+)
+
+
+class StubSession:
+    def __init__(self, slot):
+        self.slot = slot
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+class StubBrowser:
+    """
+    Session factory for the pool that keeps every session it handed out.
+    """
+
+    def __init__(self):
+        self.sessions = []
+
+    def make_session(self, slot):
+        session = StubSession(slot)
+        self.sessions.append(session)
+        return session
+
+    async def stop_session(self, session):
+        await session.stop()
+
+
+def make_pool(size=1):
+    browser = StubBrowser()
+    return BrowserSessionPool(size, browser.make_session, browser.stop_session), browser
+
+
+def run_task(pool, run_agent_task, max_retries=2, timeout_s=5):
+    task = ResearchTask(id="1", url="https://school.org/staff")
+    return asyncio.run(run_with_retries(
+        task, pool, run_agent_task,
+        fast_path=False, max_retries=max_retries, retry_delay_s=0, timeout_s=timeout_s,
+    ))
+
+
+def test_pool_reuses_healthy_session_and_replaces_failed_one():
+    pool, browser = make_pool()
+
+    async def use_pool():
+        async with pool.session() as first:
+            pass
+        async with pool.session() as second:
+            assert second is first
+        try:
+            async with pool.session():
+                raise RuntimeError("browser crashed")
+        except RuntimeError:
+            pass
+        async with pool.session() as third:
+            assert third is not first
+        await pool.close()
+
+    asyncio.run(use_pool())
+    assert [session.stopped for session in browser.sessions] == [True, True]
+    assert pool.sessions == [None]
+
+
+def test_pool_never_shares_a_session():
+    pool, browser = make_pool(size=2)
+    in_use = set()
+    peak = 0
+
+    async def task():
+        nonlocal peak
+        async with pool.session() as session:
+            assert session not in in_use
+            in_use.add(session)
+            peak = max(peak, len(in_use))
+            await asyncio.sleep(0.01)
+            in_use.discard(session)
+
+    async def run_all():
+        await asyncio.gather(*(task() for _ in range(6)))
+
+    asyncio.run(run_all())
+    assert peak == 2
+    assert len(browser.sessions) == 2
+
+
+def test_retry_after_failure_gets_fresh_session():
+    pool, browser = make_pool()
+    used = []
+
+    async def run_agent_task(task, browser_session, fingerprint):
+        used.append(browser_session)
+        if len(used) == 1:
+            raise RuntimeError("agent finished without a final result")
+        return ROWS
+
+    record = run_task(pool, run_agent_task)
+    assert record["status"] == "ok"
+    assert record["method"] == "agent"
+    assert record["attempts"] == 2
+    assert record["rows"] == [row.model_dump() for row in ROWS.rows]
+    assert used[0].stopped and used[1] is not used[0]
+
+
+def test_gives_up_after_max_retries():
+    pool, browser = make_pool()
+    calls = 0
+
+    async def run_agent_task(task, browser_session, fingerprint):
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("page unreachable")
+
+    record = run_task(pool, run_agent_task, max_retries=1)
+    assert calls == 2
+    assert record["status"] == "failed"
+    assert record["attempts"] == 2
+    assert record["error"] == "ConnectionError: page unreachable"
+    assert record["rows"] == []
+    assert all(session.stopped for session in browser.sessions)
+
+
+def test_timed_out_attempt_is_retried():
+    pool, browser = make_pool()
+
+    async def run_agent_task(task, browser_session, fingerprint):
+        if len(browser.sessions) == 1:
+            await asyncio.sleep(1)
+        return ROWS
+
+    record = run_task(pool, run_agent_task, timeout_s=0.05)
+    assert record["status"] == "ok"
+    assert record["attempts"] == 2
+    assert browser.sessions[0].stopped
+
+
+def records():
+    ok = {
+        "task_id": "1", "url": "https://school.org/staff", "status": "ok", "method": "rules",
+        "attempts": 1, "error": None, "elapsed_s": 0.1, "rows": [row.model_dump() for row in ROWS.rows],
+    }
+    failed = {
+        "task_id": "2", "url": "https://school.org/other", "status": "failed", "method": "agent",
+        "attempts": 3, "error": "TimeoutError: ", "elapsed_s": 9.0, "rows": [],
+    }
+    return [ok, failed]
+
+
+def test_result_writer_csv(tmp_path):
+    path = tmp_path / "results.csv"
+    with ResultWriter(path, ["name", "position", "email"]) as writer:
+        for record in records():
+            writer.write(record)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["url"] == "https://school.org/staff"
+    assert rows[0]["name"] == "Kim Lane"
+    assert rows[1]["status"] == "failed"
+    assert rows[1]["error"] == "TimeoutError: "
+    assert rows[1]["name"] == ""
+
+
+def test_result_writer_ndjson(tmp_path):
+    path = tmp_path / "results.ndjson"
+    with ResultWriter(path, ["name", "position", "email"]) as writer:
+        for record in records():
+            writer.write(record)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == records()
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import expired_jobs_filter
+from chunked_csv import infer_dtypes, read_csv_chunks
+
+# Every column reads differently per 1-row chunk than in the whole file
+COLUMNS = {
+    "int_blank": ["1", "", "3", "4"],
+    "bool_blank": ["True", "", "False", "True"],
+    "int_str": ["1", "abc", "3", "4"],
+    "uint64": ["18446744073709551615", "1", "2", "3"],
+    "uint64_blank": ["18446744073709551615", "", "2", "3"],
+    "uint64_negative": ["18446744073709551615", "-1", "2", "3"],
+    "uint64_float": ["18446744073709551615", "1.5", "2", "3"],
+    "label": ["a", "b", "c", "d"],
+}
+
+
+@pytest.fixture
+def mixed_csv(tmp_path):
+    path = tmp_path / "mixed.csv"
+    rows = zip(*COLUMNS.values())
+    path.write_text(",".join(COLUMNS) + "\n" + "".join(",".join(row) + "\n" for row in rows))
+    return path
+
+
+@pytest.mark.parametrize("column", list(COLUMNS))
+def test_chunks_match_whole_file_read(mixed_csv, column):
+    whole = pd.read_csv(mixed_csv, usecols=[column])
+    streamed = pd.concat(read_csv_chunks(mixed_csv, usecols=[column], chunksize=1), ignore_index=True)
+    assert streamed.to_csv(index=False) == whole.to_csv(index=False)
+    if column not in infer_dtypes(mixed_csv, usecols=[column], chunksize=1)[0]:
+        assert streamed[column].dtype == whole[column].dtype
+
+
+def test_uint64_ids_are_not_wrapped(mixed_csv):
+    _, casts = infer_dtypes(mixed_csv, usecols=["uint64"], chunksize=1)
+    assert casts == {"uint64": "uint64"}
+    chunks = list(read_csv_chunks(mixed_csv, usecols=["uint64"], chunksize=1))
+    assert chunks[0]["uint64"].iloc[0] == 18446744073709551615
+
+
+def test_filter_streaming_matches_in_memory(monkeypatch, tmp_path, mixed_csv):
+    source = pd.read_csv(mixed_csv, dtype=str, keep_default_na=False)
+    source["application_url"] = [f"https://jobs.example.com/{i}" for i in range(len(source))]
+    source.to_csv(tmp_path / "source.csv", index=False)
+    pd.DataFrame({"application_url": ["https://jobs.example.com/1"]}).to_csv(
+        tmp_path / "expired.csv", index=False
+    )
+    monkeypatch.setattr(expired_jobs_filter, "SOURCE_FILE", str(tmp_path / "source.csv"))
+    monkeypatch.setattr(expired_jobs_filter, "EXPIRED_FILE", str(tmp_path / "expired.csv"))
+    monkeypatch.setattr(expired_jobs_filter, "CHUNK_SIZE", 1)
+
+    monkeypatch.setattr(expired_jobs_filter, "OUTPUT_FILE", str(tmp_path / "in_memory.csv"))
+    expired_jobs_filter.filter_in_memory()
+    monkeypatch.setattr(expired_jobs_filter, "OUTPUT_FILE", str(tmp_path / "streamed.csv"))
+    expired_jobs_filter.filter_streaming()
+
+    in_memory = (tmp_path / "in_memory.csv").read_text()
+    assert (tmp_path / "streamed.csv").read_text() == in_memory
+    assert "18446744073709551615" in in_memory
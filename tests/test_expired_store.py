@@ -0,0 +1,158 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from expired_store import ExpiredJobStore, canonical_job_id
+
+
+def job_url(n):
+    return f"https://www.linkedin.com/jobs/view/{n}/"
+
+
+def write_csv(path, ids, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        if mode == "w":
+            f.write("title,application_url\n")
+        f.writelines(f"Job {n},{job_url(n)}\n" for n in ids)
+    # Make every write visible as a change even within one mtime tick
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.parametrize("url, job_id", [
+    ("https://www.linkedin.com/jobs/view/1234567890", "linkedin:1234567890"),
+    ("linkedin.com/jobs/view/software-engineer-at-acme-1234567890/?trk=abc", "linkedin:1234567890"),
+    ("https://uk.linkedin.com/jobs/view/1234567890/apply/", "linkedin:1234567890"),
+    ("https://www.linkedin.com/jobs/search/?currentJobId=1234567890&keywords=dev", "linkedin:1234567890"),
+    ("https://www.linkedin.com/jobs/collections/recommended/?jobId=1234567890", "linkedin:1234567890"),
+    # A job ID inside a redirect target is not this URL's job
+    ("https://linkedin.com/redir?url=https://x.com/?jobId=42", "url:linkedin.com/redir?url=https%3A%2F%2Fx.com%2F%3FjobId%3D42"),
+    ("https://www.linkedin.com/company/acme?currentJobId=abc", "url:linkedin.com/company/acme?currentJobId=abc"),
+    ("HTTPS://WWW.Jobs.Example.com/a/b/?utm_source=x&id=7&trk=y#top", "url:jobs.example.com/a/b?id=7"),
+    ("jobs.example.com/a?b=2&a=1", "url:jobs.example.com/a?a=1&b=2"),
+    ("  ", None),
+    (None, None),
+    (float("nan"), None),
+])
+def test_canonical_job_id(url, job_id):
+    assert canonical_job_id(url) == job_id
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ExpiredJobStore(tmp_path / "expired.db") as store:
+        yield store
+
+
+@pytest.fixture
+def read_urls(store, monkeypatch):
+    """
+    Records every URL the store reads from a CSV.
+    """
+    seen = []
+    add_urls = store.add_urls
+
+    def spy(urls):
+        urls = list(urls)
+        seen.extend(urls)
+        return add_urls(urls)
+
+    monkeypatch.setattr(store, "add_urls", spy)
+    return seen
+
+
+def test_add_and_look_up_url_variants(store):
+    assert store.add_urls([job_url(1), "https://linkedin.com/jobs/view/dev-at-acme-1?trk=x", "", job_url(2)]) == 2
+    assert store.add_urls([job_url(2)]) == 0
+    assert len(store) == 2
+    assert store.contains("https://uk.linkedin.com/jobs/view/1/")
+    assert not store.contains(job_url(3))
+    assert not store.contains("")
+
+    urls = pd.Series([job_url(2), job_url(3), None, "linkedin.com/jobs/search/?currentJobId=1"])
+    assert store.expired_mask(urls).tolist() == [True, False, False, True]
+
+
+def test_lookups_are_batched(store, monkeypatch):
+    monkeypatch.setattr("expired_store.LOOKUP_BATCH_SIZE", 3)
+    store.add_urls(job_url(n) for n in range(10))
+    ids = [f"linkedin:{n}" for n in range(5, 15)]
+    assert store.expired_ids(ids) == {f"linkedin:{n}" for n in range(5, 10)}
+
+
+def test_compact_prunes_old_entries(store):
+    store.add_urls([job_url(1), job_url(2)])
+    store.conn.execute(
+        "UPDATE expired_jobs SET added_at = '2000-01-01T00:00:00+00:00' WHERE job_id = 'linkedin:1'"
+    )
+    store.conn.commit()
+    assert store.compact() == 0
+    assert len(store) == 2
+    assert store.compact(older_than_days=30) == 1
+    assert store.expired_ids(["linkedin:1", "linkedin:2"]) == {"linkedin:2"}
+
+
+def test_store_persists_across_opens(tmp_path):
+    with ExpiredJobStore(tmp_path / "expired.db") as store:
+        store.add_urls([job_url(1)])
+    with ExpiredJobStore(tmp_path / "expired.db") as store:
+        assert store.contains(job_url(1))
+    with sqlite3.connect(tmp_path / "expired.db") as conn:
+        assert conn.execute("SELECT application_url FROM expired_jobs").fetchone() == (job_url(1),)
+
+
+def test_sync_imports_only_appended_rows(store, read_urls, tmp_path):
+    csv_path = tmp_path / "expired.csv"
+    write_csv(csv_path, [1, 2])
+    assert store.sync_csv(csv_path) == 2
+    assert store.sync_csv(csv_path) is None
+
+    write_csv(csv_path, [3], mode="a")
+    read_urls.clear()
+    assert store.sync_csv(csv_path) == 1
+    assert read_urls == [job_url(3)]
+    assert store.expired_ids(["linkedin:1", "linkedin:3"]) == {"linkedin:1", "linkedin:3"}
+
+
+def test_sync_rereads_unterminated_last_line(store, tmp_path):
+    csv_path = tmp_path / "expired.csv"
+    csv_path.write_text(f"title,application_url\nJob 1,{job_url(1)}\nJob 2,{job_url(2)}")
+    assert store.sync_csv(csv_path) == 2
+
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write(f"\nJob 3,{job_url(3)}\n")
+    assert store.sync_csv(csv_path) == 1
+    assert len(store) == 3
+
+
+def test_sync_reimports_shrunk_or_edited_file(store, read_urls, tmp_path):
+    csv_path = tmp_path / "expired.csv"
+    write_csv(csv_path, [1, 2, 3])
+    store.sync_csv(csv_path)
+
+    write_csv(csv_path, [4])
+    read_urls.clear()
+    assert store.sync_csv(csv_path) == 1
+    assert read_urls == [job_url(4)]
+
+    # Same length prefix rewritten, then more rows: must not trust the offset
+    write_csv(csv_path, [5, 6])
+    read_urls.clear()
+    store.sync_csv(csv_path)
+    assert read_urls == [job_url(5), job_url(6)]
+
+
+def test_sync_expired_only(store, tmp_path):
+    csv_path = tmp_path / "results.csv"
+    csv_path.write_text(
+        "application_url,expired\n"
+        f"{job_url(1)},True\n"
+        f"{job_url(2)},Unknown\n"
+    )
+    assert store.sync_csv(csv_path, expired_only=True) == 1
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write(f"{job_url(3)},True\n{job_url(4)},False\n")
+    assert store.sync_csv(csv_path, expired_only=True) == 1
+    assert store.expired_ids(["linkedin:1", "linkedin:3", "linkedin:4"]) == {"linkedin:1", "linkedin:3"}
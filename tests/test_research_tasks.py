@@ -0,0 +1,132 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+import research_tasks
+from agent_cache import TTL_S, UNVERIFIED_RESULT_TTL_S, AgentCache
+from research_tasks import ResearchTask, extract_task, load_tasks
+from staff_extract import StaffRows
+
+FIXTURES = Path(__file__).parent / "fixtures" / "staff_pages"
+
+AGENT_ROWS = {"rows": [{"name": "Kim Lane", "position": "Dean", "email": "klane@school.org"}]}
+
+
+class StubLLM:
+    """
+    Stands in for the browser agent's LLM: answers every task with AGENT_ROWS.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run_agent(self, fingerprint):
+        self.calls += 1
+        return StaffRows.model_validate_json(json.dumps(AGENT_ROWS))
+
+
+def run_task(monkeypatch, page, html=None, task=None, **kwargs):
+    if html is None:
+        html = (FIXTURES / f"{page}.html").read_text(encoding="utf-8")
+    monkeypatch.setattr(research_tasks, "fetch_html", lambda url: html)
+    llm = StubLLM()
+    task = task or ResearchTask(id="1", url="https://school.org/staff")
+    parsed, method = asyncio.run(extract_task(task, llm.run_agent, **kwargs))
+    return parsed, method, llm
+
+
+@pytest.mark.parametrize("page", ["table", "cards", "list", "cfemail"])
+def test_fast_path_skips_agent(monkeypatch, page):
+    parsed, method, llm = run_task(monkeypatch, page)
+    assert method == "rules"
+    assert llm.calls == 0
+    assert parsed.rows
+
+
+@pytest.mark.parametrize("page", [
+    "js_shell", "negative_js_shell_footer", "negative_main_office", "negative_section_heading",
+])
+def test_low_coverage_falls_back_to_agent(monkeypatch, page):
+    parsed, method, llm = run_task(monkeypatch, page)
+    assert method == "agent"
+    assert llm.calls == 1
+    assert parsed.model_dump() == AGENT_ROWS
+
+
+def test_fast_path_disabled_always_uses_agent(monkeypatch):
+    _, method, llm = run_task(monkeypatch, "table", fast_path=False)
+    assert method == "agent"
+    assert llm.calls == 1
+
+
+def test_fetch_failure_falls_back_to_agent(monkeypatch):
+    def fail(url):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(research_tasks, "fetch_html", fail)
+    llm = StubLLM()
+    task = ResearchTask(id="1", url="https://school.org/staff")
+    parsed, method = asyncio.run(extract_task(task, llm.run_agent))
+    assert method == "agent"
+    assert llm.calls == 1
+
+
+def cached_ttl(cache):
+    created_at, expires_at = cache.conn.execute(
+        "SELECT created_at, expires_at FROM cache_entries WHERE kind = 'result'"
+    ).fetchone()
+    return expires_at - created_at
+
+
+def test_agent_result_on_js_shell_gets_short_ttl(monkeypatch, tmp_path):
+    with AgentCache(tmp_path / "cache.db") as cache:
+        _, method, _ = run_task(monkeypatch, "js_shell", cache=cache)
+        assert method == "agent"
+        assert cached_ttl(cache) == pytest.approx(UNVERIFIED_RESULT_TTL_S)
+
+
+def test_agent_result_found_in_html_gets_full_ttl(monkeypatch, tmp_path):
+    html = '<p>Kim Lane, Dean: <a href="mailto:klane@school.org">klane@school.org</a></p>'
+    with AgentCache(tmp_path / "cache.db") as cache:
+        _, method, _ = run_task(monkeypatch, None, html=html, cache=cache, fast_path=False)
+        assert method == "agent"
+        assert cached_ttl(cache) == pytest.approx(TTL_S["result"])
+
+        _, method, llm = run_task(monkeypatch, None, html=html, cache=cache, fast_path=False)
+        assert method == "cache"
+        assert llm.calls == 0
+
+
+@pytest.mark.parametrize("change", [
+    {"instructions": "Only teachers."},
+    {"record_type": "faculty"},
+    {"fields": ["name", "email"]},
+])
+def test_tasks_asking_for_different_things_do_not_share_results(monkeypatch, tmp_path, change):
+    url = "https://school.org/staff"
+    with AgentCache(tmp_path / "cache.db") as cache:
+        _, method, _ = run_task(monkeypatch, "js_shell", cache=cache, task=ResearchTask(id="1", url=url))
+        assert method == "agent"
+        _, method, _ = run_task(monkeypatch, "js_shell", cache=cache, task=ResearchTask(id="1", url=url))
+        assert method == "cache"
+
+        _, method, llm = run_task(
+            monkeypatch, "js_shell", cache=cache, task=ResearchTask(id="2", url=url, **change)
+        )
+        assert method == "agent"
+        assert llm.calls == 1
+
+
+@pytest.mark.parametrize("fields, error", [
+    (["name", 3], "field 3 is not a string"),
+    (["model_config"], "clashes with a pydantic BaseModel attribute"),
+    (["first name"], "is not a valid identifier"),
+    (["name", "url", "status"], "clashes with a batch result column"),
+])
+def test_load_tasks_rejects_bad_fields(tmp_path, fields, error):
+    tasks_file = tmp_path / "tasks.jsonl"
+    tasks_file.write_text(json.dumps({"url": "https://school.org", "fields": fields}) + "\n")
+    with pytest.raises(ValueError, match=f"Task 1 in .* has invalid 'fields': .*{error}"):
+        load_tasks(tasks_file)
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from staff_extract import extract_staff_rows, page_fingerprint
+
+FIXTURES = Path(__file__).parent / "fixtures" / "staff_pages"
+PAGES = sorted(path.stem for path in FIXTURES.glob("*.html"))
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_saved_page(page):
+    html = (FIXTURES / f"{page}.html").read_text(encoding="utf-8")
+    expected = json.loads((FIXTURES / f"{page}.json").read_text(encoding="utf-8"))
+
+    parsed, coverage = extract_staff_rows(html)
+
+    assert coverage == pytest.approx(expected["coverage"])
+    if expected["rows"] is None:
+        assert parsed is None
+    else:
+        assert [row.model_dump() for row in parsed.rows] == expected["rows"]
+
+
+def card(name, position, email):
+    return f"<div><p>{name}</p><p>{position}</p><a href='mailto:{email}'>Email</a></div>"
+
+
+def test_inline_tags_do_not_split_names():
+    html = "".join([
+        card("<strong>Jane</strong> Doe", "Principal", "x1@s.org"),
+        card("Ann <b>Cole</b>", "Dean", "x2@s.org"),
+        card("Bo Lee", "Art <em>Teacher</em>", "x3@s.org"),
+    ])
+    parsed, _ = extract_staff_rows(html)
+    assert [(row.name, row.position) for row in parsed.rows] == [
+        ("Jane Doe", "Principal"), ("Ann Cole", "Dean"), ("Bo Lee", "Art Teacher"),
+    ]
+
+
+def test_too_few_rows_is_not_a_directory():
+    html = card("Jane Doe", "Principal", "x1@s.org") + card("Ann Cole", "Dean", "x2@s.org")
+    parsed, coverage = extract_staff_rows(html)
+    assert parsed is None
+    assert coverage == 1.0
+
+
+def test_footer_rows_do_not_count_toward_min_rows():
+    directory = card("Ann Cole", "Teacher", "x1@s.org") + card("Tom Reed", "Coach", "x2@s.org")
+    footer = "<footer>" + card("Jane Doe", "Principal", "jdoe@s.org") + "</footer>"
+    assert extract_staff_rows(f"<main>{directory}</main>{footer}")[0] is None
+
+    directory += card("Bo Lee", "Dean", "x9@s.org")
+    parsed, _ = extract_staff_rows(f"<main>{directory}</main>{footer}")
+    assert len(parsed.rows) == 4
+
+
+def test_unconfirmed_card_does_not_count_toward_coverage():
+    # Name-like text, no position word, mailbox unrelated to the name
+    html = "<div><h3>Sam Fox</h3><p>Gardens</p><a href='mailto:12345@s.org'>Email</a></div>"
+    assert extract_staff_rows(html) == (None, 0.0)
+
+
+def test_fingerprint_ignores_scripts_but_not_content():
+    page = "<html><body><script>var nonce = '{}';</script><p>Jane Doe</p></body></html>"
+    assert page_fingerprint(page.format("a1")) == page_fingerprint(page.format("b2"))
+    assert page_fingerprint(page) != page_fingerprint(page.replace("Jane", "John"))